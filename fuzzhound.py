@@ -17,10 +17,7 @@ from modules.cli_parser import create_argument_parser
 from modules.config_manager import load_config, validate_config, merge_cli_args
 from modules.utils import setup_logger, print_banner
 from modules.executor import execute_tests
-
-from rich.console import Console
-
-console = Console()
+from modules.console import console
 
 
 def main():
@@ -13,13 +13,12 @@ import logging
 import yaml
 from urllib.parse import urljoin
 from typing import List, Dict, Any, Optional, Union
-from rich.console import Console
+from modules.console import console
 import os
 
 # 禁用 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-console = Console()
 logger = logging.getLogger('fuzzhound.api_parser')
 
 
@@ -47,6 +46,9 @@ class APIParser:
         # 引用缓存 {url: content}
         self.ref_cache = {}
 
+        # 文档探测和外部引用共用一个 Session，复用到同一主机的连接
+        self.http = requests.Session()
+
         # 智能解析 URL
         self._parse_url()
 
@@ -257,7 +259,7 @@ class APIParser:
 
         try:
             # 获取 API 文档
-            response = requests.get(
+            response = self.http.get(
                 api_doc_url,
                 timeout=self.timeout,
                 verify=self.verify_ssl,
@@ -604,7 +606,7 @@ class APIParser:
                             
             else:
                 # 处理 HTTP/HTTPS
-                response = requests.get(
+                response = self.http.get(
                     url, 
                     timeout=self.timeout, 
                     verify=self.verify_ssl,
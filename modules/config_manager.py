@@ -5,20 +5,45 @@
 """
 
 import sys
+import functools
 import yaml
-from rich.console import Console
-from pydantic import ValidationError
+from modules.console import console
 from modules.fuzz_config import process_fuzz_args
-from modules.config_model import AppConfig
 
-console = Console()
+# 优先使用 libyaml 提供的 C 加载器，未编译 libyaml 时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# 配置文件的顶层结构，load_config 会保证这些 key 都存在
+_TOP_LEVEL_SECTIONS = (
+    'target', 'request', 'auth', 'proxy', 'blacklist',
+    'fuzz_username', 'fuzz_password', 'fuzz_number', 'fuzz_sql', 'fuzz_detection',
+    'output', 'logging', 'debug', 'default_values',
+)
+
+# 直接覆盖配置项的命令行参数：(参数名, 配置段, 配置键, 转换函数)
+# 参数值不为 None 时写入 config[配置段][配置键]
+_CLI_ARG_MAP = (
+    ('prefix', 'target', 'custom_prefix', None),
+    ('output', 'output', 'output_dir', None),
+    ('delay', 'request', 'delay', None),
+    ('default_int', 'default_values', 'integer', None),
+    ('default_float', 'default_values', 'number', None),
+    ('default_string', 'default_values', 'string', None),
+    ('default_bool', 'default_values', 'boolean', lambda v: v.lower() == 'true'),
+    ('default_date', 'default_values', 'date', None),
+    ('default_datetime', 'default_values', 'datetime', None),
+    ('default_timestamp', 'default_values', 'timestamp', None),
+)
 
 
 def load_config(config_file):
     """加载配置文件"""
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            yaml_data = yaml.safe_load(f) or {}
+        with open(config_file, 'rb') as f:
+            yaml_data = yaml.load(f, Loader=_YamlLoader) or {}
             
         # 使用 Pydantic 验证并填充默认值
         # 注意：这里我们允许部分字段缺失，由 Pydantic 填充默认值
@@ -42,20 +67,8 @@ def load_config(config_file):
         config = yaml_data
         
         # 确保基本结构存在，避免 merge_cli_args 报错
-        if 'target' not in config: config['target'] = {}
-        if 'request' not in config: config['request'] = {}
-        if 'auth' not in config: config['auth'] = {}
-        if 'proxy' not in config: config['proxy'] = {}
-        if 'blacklist' not in config: config['blacklist'] = {}
-        if 'fuzz_username' not in config: config['fuzz_username'] = {}
-        if 'fuzz_password' not in config: config['fuzz_password'] = {}
-        if 'fuzz_number' not in config: config['fuzz_number'] = {}
-        if 'fuzz_sql' not in config: config['fuzz_sql'] = {}
-        if 'fuzz_detection' not in config: config['fuzz_detection'] = {}
-        if 'output' not in config: config['output'] = {}
-        if 'logging' not in config: config['logging'] = {}
-        if 'debug' not in config: config['debug'] = {}
-        if 'default_values' not in config: config['default_values'] = {}
+        for section in _TOP_LEVEL_SECTIONS:
+            config.setdefault(section, {})
         
         return config
     except Exception as e:
@@ -63,18 +76,70 @@ def load_config(config_file):
         sys.exit(1)
 
 
+def load_config_header(config_file, max_bytes=2048):
+    """只解析配置文件开头部分，获取其中的顶层配置段
+
+    用于在完整加载前快速判断文件是否为 FuzzHound 配置文件，
+    不需要读取和解析整个文件。
+
+    Args:
+        config_file: 配置文件路径
+        max_bytes: 最多读取的字节数
+
+    Returns:
+        set: 开头部分出现的顶层 key；无法判断时返回 None，调用方应回退到 load_config
+    """
+    try:
+        with open(config_file, 'rb') as f:
+            head = f.read(max_bytes + 1)
+        truncated = len(head) > max_bytes
+        if truncated:
+            # 文件被截断，丢弃最后一个不完整的行；第一行就超出 max_bytes 时无法判断
+            line_end = head.rfind(b'\n', 0, max_bytes)
+            if line_end < 0:
+                return None
+            head = head[:line_end + 1]
+        data = yaml.load(head, Loader=_YamlLoader)
+    except (OSError, yaml.YAMLError):
+        return None
+
+    if data is None:
+        # 开头部分只有注释/空行：完整文件确实为空时才是空集合
+        return None if truncated else set()
+    if not isinstance(data, dict):
+        return None
+    return set(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_app_config_adapter():
+    """获取 AppConfig 的 TypeAdapter（只构建一次，后续复用）"""
+    from pydantic import TypeAdapter
+    from modules.config_model import AppConfig
+
+    return TypeAdapter(AppConfig)
+
+
 def validate_config(config):
-    """验证配置文件"""
-    """验证配置文件"""
+    """验证配置文件
+
+    只对用户提供的 YAML 数据做一次完整校验；之后由 merge_cli_args 合并的
+    命令行参数已经过 argparse 的类型转换，不再重复校验。
+    """
+    # 延迟导入 Pydantic，--help 等不需要校验的路径无需承担其导入开销
+    from pydantic import ValidationError
+
     try:
-        # 使用 Pydantic 进行最终验证
+        # 使用 Pydantic 进行校验
         # 这会检查类型、必需字段和默认值
-        app_config = AppConfig(**config)
+        app_config = _get_app_config_adapter().validate_python(config)
         
-        # 将验证后的配置（包含默认值）转回 dict，更新原 config
-        # 这样后续代码可以使用完整的配置（包含 Pydantic 填充的默认值）
-        validated_dict = app_config.model_dump()
-        config.update(validated_dict)
+        # 将验证后的字段值（包含 Pydantic 填充的默认值）直接写回原 config
+        # 不使用 model_dump()，避免整棵配置树的递归复制，同时保留模型未声明的配置项
+        for section_name, section_model in app_config:
+            section = config.setdefault(section_name, {})
+            for field_name, value in section_model:
+                section[field_name] = value
         
         return True
     except ValidationError as e:
@@ -107,22 +172,20 @@ def merge_cli_args(config, args):
             config['target']['api_path'] = '/api-docs'
     if args.path:
         config['target']['api_path'] = args.path
-    if args.prefix:
-        config['target']['custom_prefix'] = args.prefix
+
+    for name, section, key, transform in _CLI_ARG_MAP:
+        value = getattr(args, name, None)
+        if value is not None:
+            config[section][key] = transform(value) if transform else value
+
     if hasattr(args, 'ignore_basepath') and args.ignore_basepath:
         config['target']['ignore_basepath'] = True
-    if args.output:
-        config['output']['output_dir'] = args.output
     if args.threads:
         config['request']['threads'] = args.threads
-    if args.delay is not None:
-        config['request']['delay'] = args.delay
     if args.verbose:
         config['output']['verbose'] = True
     if args.debug:
         # 启用调试模式
-        if 'debug' not in config:
-            config['debug'] = {}
         config['debug']['enabled'] = True
         config['debug']['verbose'] = True
         config['debug']['save_requests'] = True
@@ -132,8 +195,6 @@ def merge_cli_args(config, args):
     
     # 处理代理参数
     if args.proxy:
-        if 'proxy' not in config:
-            config['proxy'] = {}
         config['proxy']['enabled'] = True
         config['proxy']['http'] = args.proxy
         config['proxy']['https'] = args.proxy
@@ -141,41 +202,9 @@ def merge_cli_args(config, args):
     
     # 处理黑名单参数
     if args.ignore_blacklist:
-        if 'blacklist' not in config:
-            config['blacklist'] = {}
         config['blacklist']['ignore_blacklist'] = True
         console.print(f"[yellow]⚠️  已忽略黑名单，将测试所有接口（包括危险操作）[/yellow]")
     
-    # 处理默认值参数
-    if hasattr(args, 'default_int') and args.default_int is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['integer'] = args.default_int
-    if hasattr(args, 'default_float') and args.default_float is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['number'] = args.default_float
-    if hasattr(args, 'default_string') and args.default_string is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['string'] = args.default_string
-    if hasattr(args, 'default_bool') and args.default_bool is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['boolean'] = args.default_bool.lower() == 'true'
-    if hasattr(args, 'default_date') and args.default_date is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['date'] = args.default_date
-    if hasattr(args, 'default_datetime') and args.default_datetime is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['datetime'] = args.default_datetime
-    if hasattr(args, 'default_timestamp') and args.default_timestamp is not None:
-        if 'default_values' not in config:
-            config['default_values'] = {}
-        config['default_values']['timestamp'] = args.default_timestamp
-
     # 处理 --fall 参数（一键启用所有Fuzz）
     if hasattr(args, 'fall') and args.fall:
         mode = args.fall
@@ -188,25 +217,17 @@ def merge_cli_args(config, args):
             console.print(f"[yellow]  └─ SQL注入Fuzz：全部参数[/yellow]")
 
             # 启用所有Fuzz，使用 "all" 模式
-            if 'fuzz_username' not in config:
-                config['fuzz_username'] = {}
             config['fuzz_username']['enabled'] = True
             config['fuzz_username']['mode'] = 'all'
             config['fuzz_username']['count'] = 0  # 0 表示使用全部字典
 
-            if 'fuzz_password' not in config:
-                config['fuzz_password'] = {}
             config['fuzz_password']['enabled'] = True
             config['fuzz_password']['mode'] = 'all'
             config['fuzz_password']['count'] = 0  # 0 表示使用全部字典
 
-            if 'fuzz_number' not in config:
-                config['fuzz_number'] = {}
             config['fuzz_number']['enabled'] = True
             config['fuzz_number']['mode'] = 'all'
 
-            if 'fuzz_sql' not in config:
-                config['fuzz_sql'] = {}
             config['fuzz_sql']['enabled'] = True
             config['fuzz_sql']['mode'] = 'all'
         else:
@@ -218,20 +239,12 @@ def merge_cli_args(config, args):
             console.print(f"[yellow]  └─ SQL注入Fuzz：关键字模式[/yellow]")
 
             # 启用所有Fuzz，使用关键字模式
-            if 'fuzz_username' not in config:
-                config['fuzz_username'] = {}
             config['fuzz_username']['enabled'] = True
 
-            if 'fuzz_password' not in config:
-                config['fuzz_password'] = {}
             config['fuzz_password']['enabled'] = True
 
-            if 'fuzz_number' not in config:
-                config['fuzz_number'] = {}
             config['fuzz_number']['enabled'] = True
 
-            if 'fuzz_sql' not in config:
-                config['fuzz_sql'] = {}
             config['fuzz_sql']['enabled'] = True
 
     # 处理其他 Fuzz 参数
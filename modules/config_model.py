@@ -1,5 +1,5 @@
-from typing import List, Dict, Optional, Union, Any
-from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Dict
+from pydantic import BaseModel, ConfigDict, Field
 
 class TargetConfig(BaseModel):
     base_url: str = Field(..., description="Target Base URL")
@@ -15,6 +15,10 @@ class RequestConfig(BaseModel):
     headers: Dict[str, str] = Field(default_factory=dict, description="Custom Headers")
     double_check: bool = Field(True, description="Double check requests")
     enum_test_limit: int = Field(0, description="Limit for enum testing (0 for all)")
+    max_body_bytes: int = Field(1048576, description="Max response body bytes to read")
+    http2: bool = Field(False, description="Use HTTP/2 via httpx (falls back to aiohttp if unavailable)")
+    base_backoff: float = Field(0.05, ge=0, description="Base retry backoff in seconds (doubled per attempt, with jitter)")
+    max_backoff: float = Field(1.0, ge=0, description="Max retry backoff in seconds")
 
 class AuthConfig(BaseModel):
     enabled: bool = Field(False, description="Enable Authentication")
@@ -24,6 +28,8 @@ class AuthConfig(BaseModel):
     cookie: str = Field("", description="Cookie String")
 
 class ProxyConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     enabled: bool = Field(False, description="Enable Proxy")
     http: str = Field("", description="HTTP Proxy")
     https: str = Field("", description="HTTPS Proxy")
@@ -67,6 +73,7 @@ class SQLFuzzConfig(BaseModel):
     detect_diff: bool = Field(True, description="Detect Response Diff")
     diff_threshold: int = Field(100, description="Length Diff Threshold")
     similarity_threshold: float = Field(0.7, description="Similarity Threshold")
+    detect_batch_size: int = Field(64, ge=1, description="Max responses scanned per SQL error detection batch")
 
 class FuzzDetectionConfig(BaseModel):
     filter_status_codes: List[int] = Field(default_factory=list, description="Filter Result Status Codes")
@@ -82,6 +89,8 @@ class LoggingConfig(BaseModel):
     level: str = Field("INFO", description="Log Level")
 
 class DebugConfig(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     enabled: bool = Field(False, description="Enable Debug Mode")
 
 class DefaultValuesConfig(BaseModel):
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+控制台输出模块
+所有模块共用同一个 rich Console 实例
+"""
+
+from rich.console import Console
+
+console = Console()
@@ -10,18 +10,23 @@ import time
 import asyncio
 import logging
 import signal
-from rich.console import Console
+from modules.console import console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
 from modules.api_parser import APIParser
 from modules.request_builder import RequestBuilder
-from modules.request_sender import RequestSender
+from modules.request_sender import get_shared_sender
 from modules.reporter import Reporter
 from modules.fuzz_detector import FuzzDetector
 from modules.sql_detector import SQLDetector
 from modules.handlers import create_normal_test_handler, create_fuzz_test_handler
 
-console = Console()
+# uvloop（基于 libuv 的事件循环）仅支持 Linux/macOS，未安装时使用 asyncio 默认事件循环
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 logger = logging.getLogger('fuzzhound')
 
 # 全局中断标志 (使用 asyncio.Event 在异步中更好，但为了兼容信号处理，使用简单的变量或 threading.Event)
@@ -370,8 +375,8 @@ async def execute_tests_async(config):
     progress.start()
     task = progress.add_task("[cyan]普通测试进度", total=total_normal_requests)
 
-    # 初始化 RequestSender (使用 context manager)
-    request_sender = RequestSender(config)
+    # 获取共享的 RequestSender (使用 context manager，整个测试过程复用同一个连接池)
+    request_sender = get_shared_sender(config)
     
     try:
         async with request_sender:
@@ -429,6 +434,8 @@ async def execute_tests_async(config):
         progress.stop()
         # 确保 session 关闭 (context manager 会处理，但如果出错可能需要额外检查)
         await request_sender.close()
+        if sql_detector:
+            sql_detector.close()
 
     # 生成报告
     if results:
@@ -441,10 +448,20 @@ async def execute_tests_async(config):
         console.print(f"\n[yellow]⚠️  没有收集到任何测试结果[/yellow]")
 
 
+def _run_async(coro):
+    """运行协程，安装了 uvloop 时使用 uvloop 事件循环"""
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 12):
+        return asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+
 def execute_tests(config):
     """执行测试入口"""
     try:
-        asyncio.run(execute_tests_async(config))
+        _run_async(execute_tests_async(config))
     except KeyboardInterrupt:
         console.print(f"\n[yellow]⚠️  用户中断测试[/yellow]")
         # 这里不需要做太多，因为 asyncio.run 会处理清理
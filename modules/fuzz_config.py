@@ -5,9 +5,30 @@ Fuzz 配置处理模块
 """
 
 import sys
-from rich.console import Console
+import functools
+from modules.console import console
 
-console = Console()
+# Fuzz 参数的预设值：default = 使用默认配置（关键字匹配 + 默认数量15），all = 所有参数 + 默认数量15
+_FUZZ_PARAM_PRESETS = {
+    'default': {},
+    'all': {'mode': 'all', 'count': 15},
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_status_list(value):
+    """解析逗号分隔的状态码列表（如 "200,500,403"）
+
+    Args:
+        value: 原始参数字符串
+
+    Returns:
+        tuple: 状态码元组
+
+    Raises:
+        ValueError: 存在无法转换为数字的状态码
+    """
+    return tuple(int(code.strip()) for code in value.split(','))
 
 
 def _parse_fuzz_param(param_value, config, config_key, fuzz_name):
@@ -19,37 +40,33 @@ def _parse_fuzz_param(param_value, config, config_key, fuzz_name):
         config_key: 配置键名（如 'fuzz_username', 'fuzz_password'）
         fuzz_name: Fuzz 名称（用于错误提示，如 '用户名', '密码'）
     """
-    if param_value == 'default':
-        # 使用默认配置（关键字匹配 + 默认数量15）
-        pass
-    elif param_value == 'all':
-        # all = 所有参数 + 默认数量15
-        config[config_key]['mode'] = 'all'
-        config[config_key]['count'] = 15
-    elif ':' in param_value:
+    preset = _FUZZ_PARAM_PRESETS.get(param_value)
+    if preset is not None:
+        # default / all 直接使用预设配置
+        config[config_key].update(preset)
+        return
+
+    prefix, sep, rest = param_value.partition(':')
+    if sep:
         # all:N 或 all:all 格式
-        parts = param_value.split(':', 1)
-        if len(parts) == 2 and parts[0] == 'all':
-            config[config_key]['mode'] = 'all'
-            if parts[1] == 'all':
-                # all:all = 所有参数 + 全部字典
-                config[config_key]['count'] = 0
-            else:
-                # all:N = 所有参数 + 随机N个
-                try:
-                    count = int(parts[1])
-                    config[config_key]['count'] = count
-                except ValueError:
-                    console.print(f"[red]❌ 错误：{fuzz_name}Fuzz参数格式错误，all:后应为数字或'all'[/red]")
-                    sys.exit(1)
-        else:
+        if prefix != 'all':
             console.print(f"[red]❌ 错误：{fuzz_name}Fuzz参数格式错误，应为 'all:N' 或 'all:all'[/red]")
             sys.exit(1)
+        config[config_key]['mode'] = 'all'
+        if rest == 'all':
+            # all:all = 所有参数 + 全部字典
+            config[config_key]['count'] = 0
+        else:
+            # all:N = 所有参数 + 随机N个
+            try:
+                config[config_key]['count'] = int(rest)
+            except ValueError:
+                console.print(f"[red]❌ 错误：{fuzz_name}Fuzz参数格式错误，all:后应为数字或'all'[/red]")
+                sys.exit(1)
     else:
         # 纯数字 = 关键字匹配 + 随机N个
         try:
-            count = int(param_value)
-            config[config_key]['count'] = count
+            config[config_key]['count'] = int(param_value)
         except ValueError:
             console.print(f"[red]❌ 错误：{fuzz_name}Fuzz参数格式错误，应为数字、'all'、'all:N' 或 'all:all'[/red]")
             sys.exit(1)
@@ -67,8 +84,6 @@ def process_fuzz_args(config, args):
     """
     # 处理单独的 Fuzz 参数
     if hasattr(args, 'fuser') and args.fuser:
-        if 'fuzz_username' not in config:
-            config['fuzz_username'] = {}
         config['fuzz_username']['enabled'] = True
 
         # 解析用户名Fuzz参数
@@ -76,8 +91,6 @@ def process_fuzz_args(config, args):
         _parse_fuzz_param(args.fuser, config, 'fuzz_username', '用户名')
 
     if hasattr(args, 'fpass') and args.fpass:
-        if 'fuzz_password' not in config:
-            config['fuzz_password'] = {}
         config['fuzz_password']['enabled'] = True
 
         # 解析密码Fuzz参数
@@ -85,8 +98,6 @@ def process_fuzz_args(config, args):
         _parse_fuzz_param(args.fpass, config, 'fuzz_password', '密码')
     
     if hasattr(args, 'fnumber') and args.fnumber:
-        if 'fuzz_number' not in config:
-            config['fuzz_number'] = {}
         config['fuzz_number']['enabled'] = True
         
         # 解析数字Fuzz参数
@@ -113,28 +124,20 @@ def process_fuzz_args(config, args):
                 sys.exit(1)
     
     if hasattr(args, 'fpsql') and args.fpsql:
-        if 'fuzz_sql' not in config:
-            config['fuzz_sql'] = {}
         config['fuzz_sql']['enabled'] = True
         if args.fpsql == 'all':
             config['fuzz_sql']['mode'] = 'all'
     
     # 处理 SQL 模式参数
     if hasattr(args, 'sql_mode') and args.sql_mode:
-        if 'fuzz_sql' not in config:
-            config['fuzz_sql'] = {}
         config['fuzz_sql']['mode'] = args.sql_mode
     
     # 处理 SQL payload 数量参数
     if hasattr(args, 'sql_payloads') and args.sql_payloads:
-        if 'fuzz_sql' not in config:
-            config['fuzz_sql'] = {}
         config['fuzz_sql']['max_payloads'] = args.sql_payloads
     
     # 处理枚举参数测试限制参数
     if hasattr(args, 'enum_limit') and args.enum_limit is not None:
-        if 'request' not in config:
-            config['request'] = {}
         config['request']['enum_test_limit'] = args.enum_limit
         if args.enum_limit == 0:
             console.print(f"[yellow]📢 枚举参数测试：测试所有枚举值（针对 API 文档中定义了 enum 的参数）[/yellow]")
@@ -143,9 +146,6 @@ def process_fuzz_args(config, args):
     
     # 处理 Fuzz 状态码筛选参数
     if hasattr(args, 'fuzz_status') and args.fuzz_status:
-        if 'fuzz_detection' not in config:
-            config['fuzz_detection'] = {}
-
         if args.fuzz_status.lower() == 'all':
             # 显示所有状态码
             config['fuzz_detection']['filter_status_codes'] = []
@@ -153,7 +153,7 @@ def process_fuzz_args(config, args):
         else:
             # 解析状态码列表
             try:
-                status_codes = [int(code.strip()) for code in args.fuzz_status.split(',')]
+                status_codes = list(_parse_status_list(args.fuzz_status))
                 config['fuzz_detection']['filter_status_codes'] = status_codes
                 console.print(f"[yellow]📢 Fuzz状态码筛选：只显示状态码 {status_codes} 的结果[/yellow]")
             except ValueError:
@@ -162,9 +162,6 @@ def process_fuzz_args(config, args):
 
     # 处理 Fuzz 前置筛选参数
     if hasattr(args, 'fuzz_filter') and args.fuzz_filter:
-        if 'fuzz_detection' not in config:
-            config['fuzz_detection'] = {}
-
         if args.fuzz_filter.lower() == 'all':
             # 对所有API进行Fuzz
             config['fuzz_detection']['fuzz_filter_codes'] = []
@@ -172,7 +169,7 @@ def process_fuzz_args(config, args):
         else:
             # 解析状态码列表
             try:
-                status_codes = [int(code.strip()) for code in args.fuzz_filter.split(',')]
+                status_codes = list(_parse_status_list(args.fuzz_filter))
                 config['fuzz_detection']['fuzz_filter_codes'] = status_codes
                 console.print(f"[yellow]📢 Fuzz前置筛选：只对状态码为 {status_codes} 的API进行Fuzz测试[/yellow]")
             except ValueError:
@@ -181,9 +178,6 @@ def process_fuzz_args(config, args):
     
     # 处理 Fuzz 级别筛选参数
     if hasattr(args, 'fuzz_level') and args.fuzz_level:
-        if 'fuzz_detection' not in config:
-            config['fuzz_detection'] = {}
-        
         config['fuzz_detection']['level_filter'] = args.fuzz_level
         
         level_desc = {
@@ -5,14 +5,39 @@ Fuzz 检测模块
 用于判断用户名 Fuzz 是否成功
 """
 
+import re
 import logging
-import json
+from modules.utils import dumps
 
 logger = logging.getLogger('fuzzhound.fuzz_detector')
 
 
+class _Baseline:
+    """基准响应（使用 __slots__，比每个 API 一个 dict 更省内存、访问更快）"""
+
+    __slots__ = ('status_code', 'response_length', 'response_time', 'response_body', '_body_text')
+
+    def __init__(self, status_code, response_length, response_time, response_body):
+        self.status_code = status_code
+        self.response_length = response_length
+        self.response_time = response_time
+        self.response_body = response_body
+        self._body_text = None
+
+    @property
+    def body_text(self):
+        """响应体的文本形式（同一基准会与大量 Fuzz 响应比较，只转换一次）"""
+        if self._body_text is None:
+            self._body_text = str(self.response_body) if self.response_body is not None else ''
+        return self._body_text
+
+
 class FuzzDetector:
     """Fuzz 检测器"""
+
+    # 响应长度增加的评分表：[长度档位][两者都是认证错误 ? 0 : 1]
+    # 长度档位：0 = 较小，1 = >500B，2 = >1KB；都是认证错误时分数减半
+    _LENGTH_INCREASE_SCORES = ((10, 20), (12, 25), (15, 30))
     
     def __init__(self, config):
         self.config = config
@@ -33,6 +58,10 @@ class FuzzDetector:
         self.success_keywords = [kw.lower() for kw in self.detection_config.get('success_keywords', [])]
         self.failure_keywords = [kw.lower() for kw in self.detection_config.get('failure_keywords', [])]
 
+        # 将关键字编译为单个忽略大小写的正则，一次扫描响应体即可完成匹配
+        self._success_re = self._compile_keywords(self.success_keywords)
+        self._failure_re = self._compile_keywords(self.failure_keywords)
+
         # 评分阈值
         self.score_threshold_possible = self.detection_config.get('score_threshold_possible', 50)
         self.score_threshold_likely = self.detection_config.get('score_threshold_likely', 70)
@@ -44,25 +73,25 @@ class FuzzDetector:
         """设置基准响应
 
         Args:
-            api_key: API 标识（method + path）
+            api_key: API 标识，(method, path) 元组
             result: 基准请求的响应结果
         """
-        self.baseline_responses[api_key] = {
-            'status_code': result['status_code'],
-            'response_length': result['response_length'],
-            'response_time': result['response_time'],
-            'response_body': result.get('response_body', '')
-        }
-        logger.debug(f"📊 设置基准响应: {api_key} - 状态码:{result['status_code']}, 长度:{result['response_length']}")
+        self.baseline_responses[api_key] = _Baseline(
+            result['status_code'],
+            result['response_length'],
+            result['response_time'],
+            result.get('response_body', '')
+        )
+        logger.debug(f"📊 设置基准响应: {api_key[0]}:{api_key[1]} - 状态码:{result['status_code']}, 长度:{result['response_length']}")
 
     def get_baseline(self, api_key):
         """获取基准响应
 
         Args:
-            api_key: API 标识（method + path）
+            api_key: API 标识，(method, path) 元组
 
         Returns:
-            dict: 基准响应数据，如果不存在则返回 None
+            _Baseline: 基准响应数据，如果不存在则返回 None
         """
         return self.baseline_responses.get(api_key)
 
@@ -73,13 +102,13 @@ class FuzzDetector:
             result: 请求结果
             
         Returns:
-            str: API 标识
+            tuple: API 标识，(method, path) 元组
         """
         request_data = result.get('request', {})
         api = request_data.get('api', {})
         method = api.get('method', result.get('method', 'GET'))
         path = api.get('path', '')
-        return f"{method}:{path}"
+        return (method, path)
     
     def analyze_fuzz_result(self, result):
         """分析 Fuzz 结果
@@ -97,19 +126,18 @@ class FuzzDetector:
         api_key = self.get_api_key(result)
         
         # 如果没有基准响应，无法判断
-        if api_key not in self.baseline_responses:
-            logger.debug(f"⚠️  没有找到基准响应: {api_key}")
+        baseline = self.baseline_responses.get(api_key)
+        if baseline is None:
+            logger.debug(f"⚠️  没有找到基准响应: {api_key[0]}:{api_key[1]}")
             return None
         
-        baseline = self.baseline_responses[api_key]
-        
         # 开始评分
         score = 0
         reasons = []
 
         # 1. 状态码判断 (最高50分)
         status_code = result['status_code']
-        baseline_status = baseline['status_code']
+        baseline_status = baseline.status_code
 
         # 检测是否两者都是认证错误（用于后续降低权重）
         both_auth_errors = (status_code in self.auth_status_codes and
@@ -132,7 +160,7 @@ class FuzzDetector:
         # 2. 响应长度判断 (最高30分)
         # 原则：响应包越长，价值越高（可能返回了更多数据）
         response_length = result['response_length']
-        baseline_length = baseline['response_length']
+        baseline_length = baseline.response_length
 
         if baseline_length > 0:
             length_diff_percent = abs(response_length - baseline_length) / baseline_length * 100
@@ -140,17 +168,9 @@ class FuzzDetector:
             if length_diff_percent > self.length_diff_threshold:
                 if response_length > baseline_length:
                     # 响应长度增加（高价值）
-                    # 根据增加的幅度和绝对长度来评分
-                    if response_length > 1000:
-                        # 响应包很大（>1KB），可能返回了详细数据
-                        length_score = 15 if both_auth_errors else 30
-                    elif response_length > 500:
-                        # 响应包中等（>500B）
-                        length_score = 12 if both_auth_errors else 25
-                    else:
-                        # 响应包较小
-                        length_score = 10 if both_auth_errors else 20
-                    score += length_score
+                    # 根据响应包的绝对长度分档评分：较小 / >500B / >1KB（可能返回了详细数据）
+                    bucket = (response_length > 500) + (response_length > 1000)
+                    score += self._LENGTH_INCREASE_SCORES[bucket][0 if both_auth_errors else 1]
                     reasons.append(f"响应长度增加{length_diff_percent:.1f}% (从{baseline_length}到{response_length}字节)")
                 else:
                     # 响应长度减少（低价值，可能只是错误消息变短）
@@ -160,7 +180,7 @@ class FuzzDetector:
 
         # 3. 响应时间判断 (最高10分)
         response_time = result['response_time']
-        baseline_time = baseline['response_time']
+        baseline_time = baseline.response_time
 
         if baseline_time > 0:
             time_ratio = response_time / baseline_time
@@ -170,25 +190,25 @@ class FuzzDetector:
                 reasons.append(f"响应时间增加{time_ratio:.1f}倍")
 
         # 4. 响应内容关键字判断 (最高20分)
-        response_body = result.get('response_body', '')
-        response_text = self._extract_text(response_body).lower()
-
-        success_keyword_found = False
-        failure_keyword_found = False
-
-        for keyword in self.success_keywords:
-            if keyword in response_text:
-                score += 20
-                reasons.append(f"包含成功关键字'{keyword}'")
-                success_keyword_found = True
-                break
-
-        for keyword in self.failure_keywords:
-            if keyword in response_text:
-                score -= 10
-                reasons.append(f"包含失败关键字'{keyword}'")
-                failure_keyword_found = True
-                break
+        # 关键字最多 +20 分，即使命中也达不到 possible 阈值时（结果必然为 unlikely），跳过对响应体的扫描
+        # 可能被上报的结果仍然扫描，以保留关键字原因和失败关键字的扣分
+        max_gain = 20 if self._success_re else 0
+
+        if score + max_gain >= self.score_threshold_possible:
+            response_body = result.get('response_body', '')
+            response_text = self._extract_text(response_body)
+
+            if self._success_re:
+                match = self._success_re.search(response_text)
+                if match:
+                    score += 20
+                    reasons.append(f"包含成功关键字'{match.group(0).lower()}'")
+
+            if self._failure_re:
+                match = self._failure_re.search(response_text)
+                if match:
+                    score -= 10
+                    reasons.append(f"包含失败关键字'{match.group(0).lower()}'")
 
         # 5. 综合判断
         if score >= self.score_threshold_likely:
@@ -227,6 +247,20 @@ class FuzzDetector:
 
         return analysis
 
+    @staticmethod
+    def _compile_keywords(keywords):
+        """将关键字列表编译为忽略大小写的正则
+
+        Args:
+            keywords: 关键字列表
+
+        Returns:
+            re.Pattern: 编译后的正则，关键字为空时返回 None
+        """
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
     def _extract_text(self, response_body):
         """从响应体中提取文本
 
@@ -238,8 +272,8 @@ class FuzzDetector:
         """
         if isinstance(response_body, str):
             return response_body
-        elif isinstance(response_body, dict):
-            return json.dumps(response_body)
+        elif isinstance(response_body, (dict, list)):
+            return dumps(response_body)
         else:
             return str(response_body)
 
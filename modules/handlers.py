@@ -90,8 +90,7 @@ def create_normal_test_handler(config, request_builder, request_sender, reporter
 
                 # 设置基准响应（使用第一个正常请求作为基准，供后续Fuzz使用）
                 if any_fuzz_enabled and idx == 0:
-                    baseline_key = fuzz_detector.get_api_key(result)
-                    fuzz_detector.set_baseline(baseline_key, result)
+                    fuzz_detector.set_baseline((api.get('method', 'GET'), api.get('path', '')), result)
 
                 # 记录第一个请求的状态码（用于 Fuzz 前置筛选）
                 if idx == 0:
@@ -156,7 +155,7 @@ def create_fuzz_test_handler(config, request_sender, reporter, fuzz_detector,
                 # 确保 response_body 是字符串
                 if not isinstance(response_body, str):
                     response_body = str(response_body) if response_body is not None else ''
-                has_sql_error, matched_errors = sql_detector.detect_sql_error(response_body)
+                has_sql_error, matched_errors = await sql_detector.detect_sql_error_batched(response_body)
 
                 # 分析响应差异
                 diff_result = {}
@@ -6,16 +6,14 @@
 """
 
 from pathlib import Path
-from rich.console import Console
+from modules.console import console
 from rich.table import Table
-from modules.utils import format_size, format_time
+from modules.utils import format_size, format_time, dumps
+from modules.request_sender import RequestSender
 import json
 from datetime import datetime
 
 
-console = Console()
-
-
 class Reporter:
     """报告生成器"""
     
@@ -953,17 +951,16 @@ class Reporter:
 
             # 转义详情数据用于 data 属性
             details_data = {
-                'request': result['raw_request'],
+                'request': RequestSender.build_raw_request(result),
                 'headers': self._format_headers(result.get('response_headers', {})),
-                'response': result['raw_response'],
+                'response': RequestSender.build_raw_response(result),
                 'url': url,
                 'method': method,
                 'status': status_code,
                 'curl': curl_cmd
             }
 
-            import json
-            details_json = json.dumps(details_data).replace("'", "&#39;").replace('"', '&quot;')
+            details_json = dumps(details_data).replace("'", "&#39;").replace('"', '&quot;')
 
             html += f"""
                     <tr data-details='{details_json}'>
@@ -1215,13 +1212,13 @@ class Reporter:
         for idx, result in enumerate(results):
             if self.save_requests:
                 req_file = raw_dir / f'request_{idx+1}.txt'
-                with open(req_file, 'w', encoding='utf-8') as f:
-                    f.write(result['raw_request'])
+                with open(req_file, 'w', encoding='utf-8', newline='') as f:
+                    f.write(RequestSender.build_raw_request(result))
 
             if self.save_responses:
                 resp_file = raw_dir / f'response_{idx+1}.txt'
-                with open(resp_file, 'w', encoding='utf-8') as f:
-                    f.write(result['raw_response'])
+                with open(resp_file, 'w', encoding='utf-8', newline='') as f:
+                    f.write(RequestSender.build_raw_response(result))
 
     def _generate_csv_report(self, results):
         """生成 CSV 报告"""
@@ -1263,14 +1260,12 @@ class Reporter:
                     fuzz_type,
                     fuzz_level,
                     fuzz_score,
-                    result['raw_request'],
-                    result['raw_response']
+                    RequestSender.build_raw_request(result),
+                    RequestSender.build_raw_response(result)
                 ])
 
     def _generate_json_report(self, results):
         """生成 JSON 报告"""
-        import json
-
         json_file = self.output_dir / 'report.json'
 
         # 构造 JSON 数据
@@ -1300,9 +1295,9 @@ class Reporter:
                 'fuzz_type': request_data.get('fuzz_type', 'normal'),
                 'success': result['success'],
                 'error': result.get('error', ''),
-                'raw_request': result['raw_request'],
-                'raw_response': result['raw_response'],
-                'response_headers': result.get('response_headers', {}),
+                'raw_request': RequestSender.build_raw_request(result),
+                'raw_response': RequestSender.build_raw_response(result),
+                'response_headers': dict(result.get('response_headers', {})),
                 'response_body': result.get('response_body', '')
             }
 
@@ -1313,5 +1308,5 @@ class Reporter:
             data['results'].append(result_obj)
 
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write(dumps(data, pretty=True))
 
@@ -7,16 +7,85 @@
 
 import asyncio
 import aiohttp
+import io
 import time
-import json
+import random
 import logging
 import ssl
 from pathlib import Path
-from datetime import datetime
 from urllib.parse import urlencode, urlparse
 
+from modules.utils import dumps, loads
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 logger = logging.getLogger('fuzzhound.request_sender')
 
+# 不可恢复的错误（证书校验失败、域名解析失败），重试没有意义
+# ClientConnectorDNSError 在 aiohttp 3.10.6 才加入
+_NON_RETRYABLE_ERRORS = (aiohttp.ClientConnectorCertificateError,)
+if hasattr(aiohttp, 'ClientConnectorDNSError'):
+    _NON_RETRYABLE_ERRORS += (aiohttp.ClientConnectorDNSError,)
+
+# 调试文件名中需要替换的字符（URL 分隔符和 Windows 文件名不允许的字符）
+_FILENAME_TRANS = str.maketrans({c: '_' for c in '/?:\\*"<>|'})
+
+# Content-Type 分类
+CT_OTHER = 0
+CT_JSON = 1
+CT_FORM = 2
+CT_MULTIPART = 3
+
+
+def _classify_ct(content_type):
+    """将 Content-Type 归类为 CT_JSON / CT_FORM / CT_MULTIPART / CT_OTHER
+
+    Args:
+        content_type: Content-Type 头的值（可为空）
+
+    Returns:
+        int: Content-Type 类别
+    """
+    if not content_type:
+        return CT_OTHER
+    content_type = content_type.lstrip().lower()
+    if content_type.startswith('application/json'):
+        return CT_JSON
+    if content_type.startswith('application/x-www-form-urlencoded'):
+        return CT_FORM
+    if content_type.startswith('multipart/form-data'):
+        return CT_MULTIPART
+    return CT_OTHER
+
+
+def _canonical_header_name(name):
+    """将响应头名称规范为 Content-Type 形式（HTTP/2 的响应头名称均为小写）"""
+    return '-'.join(part.capitalize() for part in name.split('-'))
+
+
+# 整个测试过程共用的 RequestSender（见 get_shared_sender）
+_shared_sender = None
+
+
+def get_shared_sender(config):
+    """获取共享的请求发送器
+
+    整个 Fuzz 过程复用同一个 RequestSender 及其连接池，避免重复建立 TCP/TLS 连接。
+
+    Args:
+        config: 配置字典
+
+    Returns:
+        RequestSender: 共享的请求发送器
+    """
+    global _shared_sender
+    if _shared_sender is None or _shared_sender.config is not config:
+        _shared_sender = RequestSender(config)
+    return _shared_sender
+
 
 class RequestSender:
     """请求发送器 (AsyncIO)"""
@@ -26,7 +95,19 @@ class RequestSender:
         self.timeout = config['target'].get('timeout', 10)
         self.verify_ssl = config['target'].get('verify_ssl', False)
         self.retry = config['request'].get('retry', 1)
+        # 重试间隔：指数退避 + 随机抖动（秒）
+        self.base_backoff = config['request'].get('base_backoff', 0.05)
+        self.max_backoff = config['request'].get('max_backoff', 1.0)
         self.delay = config['request'].get('delay', 0)
+        # 连接池大小与并发数一致（复用 threads 参数作为并发数）
+        self.concurrency = config['request'].get('threads', 5)
+        # 单个响应最多读取的字节数，超出部分丢弃
+        self.max_body = config['request'].get('max_body_bytes', 1048576)
+        # 使用 HTTP/2（需要安装 httpx[http2]），单个连接上多路复用并发请求
+        self.http2 = config['request'].get('http2', False)
+        # 以下在整个测试过程中不变，创建时计算一次，send 中不再重复判断
+        self._skip_delay = self.delay <= 0
+        self._log_debug = logger.isEnabledFor(logging.DEBUG)
 
         # 调试配置
         self.debug_config = config.get('debug', {})
@@ -56,33 +137,83 @@ class RequestSender:
             self.ssl_context.check_hostname = False
             self.ssl_context.verify_mode = ssl.CERT_NONE
 
-        # Session 将在 enter_context 中创建，或者在第一次发送时创建
+        # Session（或 HTTP/2 模式下的 httpx 客户端）在 __aenter__ 中创建，整个测试过程复用
         self.session = None
+        self.client = None
+
+        # 调试文件由后台任务写入，避免磁盘 IO 阻塞事件循环（在 __aenter__ 中创建）
+        self._debug_queue = None
+        self._debug_task = None
         
     async def __aenter__(self):
         """上下文管理器入口"""
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        connector = aiohttp.TCPConnector(ssl=self.ssl_context, limit=0) # limit=0 禁用连接池限制，由外部控制并发
-        self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        if self.http2:
+            self.client = self._create_http2_client()
+
+        if self.client is None:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            connector = aiohttp.TCPConnector(
+                ssl=self.ssl_context,
+                limit=self.concurrency,
+                limit_per_host=self.concurrency,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+        if self.debug_enabled and (self.save_requests or self.save_responses):
+            self._debug_queue = asyncio.Queue(maxsize=10000)
+            self._debug_task = asyncio.create_task(self._debug_writer())
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """上下文管理器出口"""
-        if self.session:
-            await self.session.close()
+        await self.close()
 
     async def close(self):
         """关闭 session"""
+        if self._debug_task:
+            # 通知后台写入任务退出，并等待队列中剩余的调试信息写完
+            await self._debug_queue.put(None)
+            await self._debug_task
+            self._debug_task = None
+            self._debug_queue = None
         if self.session:
             await self.session.close()
+            self.session = None
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    def _create_http2_client(self):
+        """创建 HTTP/2 客户端，httpx 或 h2 未安装、httpx 版本过旧时返回 None（回退到 aiohttp）"""
+        if httpx is None:
+            logger.warning("未安装 httpx，无法使用 HTTP/2，回退到 HTTP/1.1 (pip install 'httpx[http2]')")
+            return None
+        try:
+            return httpx.AsyncClient(
+                http2=True,
+                verify=self.ssl_context,
+                timeout=self.timeout,
+                proxy=self.proxy,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                )
+            )
+        except ImportError:
+            logger.warning("未安装 h2，无法使用 HTTP/2，回退到 HTTP/1.1 (pip install 'httpx[http2]')")
+            return None
+        except TypeError as e:
+            # proxy 参数需要 httpx >= 0.26
+            logger.warning(f"当前 httpx 版本不支持所需参数，回退到 HTTP/1.1 (pip install -U 'httpx[http2]'): {e}")
+            return None
 
     async def send(self, request_data):
         """发送请求 (异步)"""
-        if not self.session:
-            # 如果没有使用上下文管理器，临时创建一个 session (不推荐，性能较差)
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context, limit=0)
-            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        if not self.session and not self.client:
+            raise RuntimeError("RequestSender 未初始化，请通过 async with 使用以复用连接池")
 
         method = request_data['method']
         url = request_data['url']
@@ -90,72 +221,75 @@ class RequestSender:
         params = request_data.get('params', {})
         body = request_data.get('body')
 
-        logger.debug(f"📤 发送请求: {method} {url}")
-        if params:
-            logger.debug(f"   参数: {params}")
-        if body:
-            logger.debug(f"   请求体: {str(body)[:100]}...")
+        log_debug = self._log_debug
+        if log_debug:
+            logger.debug(f"📤 发送请求: {method} {url}")
+            if params:
+                logger.debug(f"   参数: {params}")
+            if body:
+                logger.debug(f"   请求体: {str(body)[:100]}...")
 
         # 延迟
-        if self.delay > 0:
+        if not self._skip_delay:
             await asyncio.sleep(self.delay)
 
+        # 请求的 Content-Type 只解析一次，JSON 序列化和构造请求参数共用
+        ct_kind = _classify_ct(headers.get('Content-Type'))
+
+        # JSON 请求体在进入重试循环前序列化一次，每次重试直接发送同一份字节
+        json_body = dumps(body).encode('utf-8') if body is not None and ct_kind == CT_JSON else None
+
         # 准备请求数据
-        kwargs = {
-            'headers': headers,
-            'params': params,
-            'proxy': self.proxy
-        }
-        
-        # 处理请求体
-        if body is not None:
-            content_type = headers.get('Content-Type', '')
-            
-            if 'application/json' in content_type:
-                kwargs['json'] = body
-            elif 'application/x-www-form-urlencoded' in content_type:
-                kwargs['data'] = body
-            elif 'multipart/form-data' in content_type:
-                # aiohttp 处理 multipart 比较特殊，这里简化处理，假设 body 是 FormData
-                # 如果 body 是 dict，aiohttp 会自动处理为 form-data
-                kwargs['data'] = body
-            else:
-                kwargs['data'] = body
+        if self.client is not None:
+            kwargs = self._build_http2_kwargs(headers, params, body, json_body)
+        else:
+            kwargs = self._build_aiohttp_kwargs(headers, params, body, json_body, ct_kind)
         
         # 发送请求
         response = None
         error = None
         start_time = time.time()
         resp_content = b''
-        resp_text = ''
+        truncated = False
         status_code = 0
         resp_headers = {}
 
         for attempt in range(self.retry + 1):
             try:
+                if self.client is not None:
+                    resp, resp_content, truncated = await self._send_http2(method, url, kwargs)
+                    status_code = resp.status_code
+                    resp_headers = {_canonical_header_name(key): value for key, value in resp.headers.items()}
+                    response = resp
+                    break
+
                 async with self.session.request(method, url, **kwargs) as resp:
                     status_code = resp.status
-                    resp_headers = dict(resp.headers)
-                    # 读取响应内容
-                    resp_content = await resp.read()
-                    try:
-                        resp_text = resp_content.decode('utf-8', errors='replace')
-                    except:
-                        resp_text = str(resp_content)
+                    # 直接保存 aiohttp 的只读响应头（CIMultiDictProxy，不区分大小写），不再复制为 dict
+                    resp_headers = resp.headers
+                    # 读取响应内容（解码/JSON 解析在请求完成后统一进行一次）
+                    resp_content, truncated = await self._read_body(resp)
                     
                     # 请求成功
                     response = resp # 仅用于标记成功
                     break
+            except _NON_RETRYABLE_ERRORS as e:
+                error = str(e)
+                break
             except Exception as e:
                 error = str(e)
                 if attempt < self.retry:
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(self._backoff_delay(attempt))
                     continue
 
         end_time = time.time()
         elapsed_time = end_time - start_time
 
+        # 响应体只解码/解析一次，build_raw_response 直接复用解析结果
+        response_body = self._parse_response_body(resp_content, resp_headers)
+
         # 构造结果
+        # 原始请求/响应包只用于报告和调试文件，大部分结果不会用到，需要时通过 build_raw_request / build_raw_response 构造
         result = {
             'request': request_data,
             'method': method,
@@ -164,124 +298,255 @@ class RequestSender:
             'response_length': len(resp_content),
             'response_time': elapsed_time,
             'response_headers': resp_headers,
-            'response_body': self._parse_response_body(resp_text, resp_headers),
+            'response_body': response_body,
             'error': error,
             'success': response is not None and status_code < 400,
-            'raw_request': self._build_raw_request(method, url, headers, params, body),
-            'raw_response': self._build_raw_response(status_code, resp_headers, resp_text) if response is not None else ''
+            'truncated': truncated
         }
 
         # 记录响应信息
-        if response is not None:
-            logger.debug(f"📥 收到响应: {status_code} ({len(resp_content)} bytes, {elapsed_time:.2f}s)")
-        else:
-            logger.debug(f"❌ 请求失败: {error}")
+        if log_debug:
+            if response is not None:
+                logger.debug(f"📥 收到响应: {status_code} ({len(resp_content)} bytes, {elapsed_time:.2f}s)")
+            else:
+                logger.debug(f"❌ 请求失败: {error}")
 
-        # 调试模式：保存请求和响应详情
-        if self.debug_enabled:
-            self._save_debug_info(result)
+        # 调试模式：保存请求和响应详情（交给后台任务写入）
+        if self._debug_queue is not None:
+            await self._debug_queue.put(self._build_debug_entry(result))
 
         return result
 
-    def _save_debug_info(self, result):
-        """保存调试信息到文件"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-            method = result['method']
-            status = result['status_code']
-
-            # 生成文件名（安全的文件名）
-            url_path = result['url'].replace('://', '_').replace('/', '_').replace('?', '_')[:50]
-            filename_base = f"{timestamp}_{method}_{status}_{url_path}"
-
-            # 保存请求
-            if self.save_requests:
-                request_file = self.debug_dir / f"{filename_base}_request.txt"
-                with open(request_file, 'w', encoding='utf-8') as f:
-                    f.write(result['raw_request'])
-                logger.debug(f"保存请求到: {request_file}")
-
-            # 保存响应
-            if self.save_responses:
-                response_file = self.debug_dir / f"{filename_base}_response.txt"
-                with open(response_file, 'w', encoding='utf-8') as f:
-                    f.write(result['raw_response'])
-                logger.debug(f"保存响应到: {response_file}")
-
-        except Exception as e:
-            logger.error(f"保存调试信息失败: {e}")
-    
-    def _parse_response_body(self, text, headers):
-        """解析响应体"""
-        try:
-            content_type = headers.get('Content-Type', '')
-            if 'application/json' in content_type:
-                return json.loads(text)
+    def _backoff_delay(self, attempt):
+        """第 attempt 次失败后的重试等待时间（指数退避，乘以 0.5~1.5 的随机抖动）"""
+        return min(self.max_backoff, self.base_backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def _build_aiohttp_kwargs(self, headers, params, body, json_body, ct_kind):
+        """构造 aiohttp 请求参数
+
+        json_body 为已序列化的 JSON 请求体（非 JSON 请求为 None）
+        """
+        kwargs = {
+            'headers': headers,
+            'params': params,
+            'proxy': self.proxy
+        }
+
+        # 处理请求体
+        if body is not None:
+            if json_body is not None:
+                kwargs['data'] = json_body
+            elif ct_kind == CT_FORM:
+                kwargs['data'] = body
+            elif ct_kind == CT_MULTIPART:
+                # aiohttp 处理 multipart 比较特殊，这里简化处理，假设 body 是 FormData
+                # 如果 body 是 dict，aiohttp 会自动处理为 form-data
+                kwargs['data'] = body
+            else:
+                kwargs['data'] = body
+        return kwargs
+
+    def _build_http2_kwargs(self, headers, params, body, json_body):
+        """构造 httpx 请求参数
+
+        json_body 为已序列化的 JSON 请求体（非 JSON 请求为 None）
+        """
+        kwargs = {'headers': headers, 'params': params}
+        if body is not None:
+            if json_body is not None:
+                kwargs['content'] = json_body
+            elif isinstance(body, dict):
+                kwargs['data'] = body
             else:
-                return text
-        except:
-            return text
+                kwargs['content'] = body
+        return kwargs
+
+    async def _send_http2(self, method, url, kwargs):
+        """通过 httpx 客户端发送请求 (HTTP/2)
+
+        Returns:
+            tuple: (响应对象, 响应内容, 是否被截断)
+        """
+        async with self.client.stream(method, url, **kwargs) as resp:
+            chunks = []
+            size = 0
+            async for chunk in resp.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_body:
+                    break
+
+        content = b''.join(chunks)
+        if len(content) > self.max_body:
+            return resp, content[:self.max_body], True
+        return resp, content, False
+
+    async def _read_body(self, resp):
+        """读取响应体，最多读取 max_body 字节
+
+        SQL 错误等特征几乎都出现在响应开头，超大的响应（如文件下载）没有必要完整读取。
+
+        Returns:
+            tuple: (响应内容, 是否被截断)
+        """
+        chunks = []
+        remaining = self.max_body + 1  # 多读 1 字节用于判断是否超出上限
+        while remaining > 0:
+            chunk = await resp.content.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        content = b''.join(chunks)
+        if len(content) > self.max_body:
+            return content[:self.max_body], True
+        return content, False
+
+    def _build_debug_entry(self, result):
+        """构造待写入的调试信息 (文件名前缀, 原始请求, 原始响应)"""
+        now_ns = time.time_ns()
+        timestamp = f"{now_ns // 1_000_000_000}_{now_ns % 1_000_000_000:09d}"
+        method = result['method']
+        status = result['status_code']
+
+        # 生成文件名（安全的文件名）
+        url_path = result['url'].translate(_FILENAME_TRANS)[:50]
+        filename_base = f"{timestamp}_{method}_{status}_{url_path}"
+        raw_request = self.build_raw_request(result) if self.save_requests else ''
+        raw_response = self.build_raw_response(result) if self.save_responses else ''
+        return filename_base, raw_request, raw_response
+
+    async def _debug_writer(self):
+        """后台写入调试信息，每次取出队列中已有的全部条目批量写入"""
+        loop = asyncio.get_running_loop()
+        while True:
+            entries = [await self._debug_queue.get()]
+            while not self._debug_queue.empty():
+                entries.append(self._debug_queue.get_nowait())
+
+            stop = None in entries
+            entries = [entry for entry in entries if entry is not None]
+            if entries:
+                await loop.run_in_executor(None, self._save_debug_info, entries)
+            if stop:
+                break
+
+    def _save_debug_info(self, entries):
+        """保存调试信息到文件（在线程池中执行）"""
+        for filename_base, raw_request, raw_response in entries:
+            try:
+                # 保存请求
+                if self.save_requests:
+                    request_file = self.debug_dir / f"{filename_base}_request.txt"
+                    with open(request_file, 'w', encoding='utf-8', newline='') as f:
+                        f.write(raw_request)
+                    logger.debug(f"保存请求到: {request_file}")
+
+                # 保存响应
+                if self.save_responses:
+                    response_file = self.debug_dir / f"{filename_base}_response.txt"
+                    with open(response_file, 'w', encoding='utf-8', newline='') as f:
+                        f.write(raw_response)
+                    logger.debug(f"保存响应到: {response_file}")
+
+            except Exception as e:
+                logger.error(f"保存调试信息失败: {e}")
     
-    def _build_raw_request(self, method, url, headers, params, body):
-        """构造原始请求包 (用于展示)"""
-        parsed_url = urlparse(url)
+    def _parse_response_body(self, content, headers):
+        """解析响应体
+
+        JSON 响应直接从字节解析，其他响应按 UTF-8 解码为文本
+        """
+        if _classify_ct(headers.get('Content-Type')) == CT_JSON:
+            try:
+                return loads(content)
+            except Exception:
+                pass
+        return content.decode('utf-8', errors='replace')
+    
+    @staticmethod
+    def build_raw_request(result):
+        """构造原始请求包 (用于报告和调试文件展示)
+
+        Args:
+            result: send 返回的请求结果
+
+        Returns:
+            str: 原始请求包文本
+        """
+        request_data = result['request']
+        method = result['method']
+        headers = request_data.get('headers', {})
+        params = request_data.get('params', {})
+        body = request_data.get('body')
+        parsed_url = urlparse(result['url'])
         
         # 构造请求行
         path = parsed_url.path
         if params:
             path += '?' + urlencode(params)
         
-        lines = [f"{method} {path} HTTP/1.1"]
-        lines.append(f"Host: {parsed_url.netloc}")
+        buf = io.StringIO()
+        buf.write(f"{method} {path} HTTP/1.1\r\n")
+        buf.write(f"Host: {parsed_url.netloc}\r\n")
         
         # 添加请求头
         for key, value in headers.items():
-            lines.append(f"{key}: {value}")
+            buf.write(f"{key}: {value}\r\n")
         
         # 添加请求体
         if body is not None:
-            content_type = headers.get('Content-Type', '')
-            
-            if 'application/json' in content_type:
-                body_str = json.dumps(body, ensure_ascii=False, indent=2)
+            if _classify_ct(headers.get('Content-Type')) == CT_JSON:
+                body_str = dumps(body, pretty=True)
             elif isinstance(body, dict):
                 body_str = urlencode(body)
             else:
                 body_str = str(body)
             
-            lines.append(f"Content-Length: {len(body_str)}")
-            lines.append("")
-            lines.append(body_str)
+            buf.write(f"Content-Length: {len(body_str)}\r\n\r\n")
+            buf.write(body_str)
         else:
-            lines.append("")
+            buf.write("\r\n")
         
-        return "\n".join(lines)
+        return buf.getvalue()
     
-    def _build_raw_response(self, status_code, headers, body_text):
-        """构造原始响应包 (用于展示)"""
+    @staticmethod
+    def build_raw_response(result):
+        """构造原始响应包 (用于报告和调试文件展示)
+
+        Args:
+            result: send 返回的请求结果，response_body 为已解析的 JSON 或响应文本
+
+        Returns:
+            str: 原始响应包文本，未收到响应时为空字符串
+        """
+        status_code = result['status_code']
+        if not status_code:
+            return ''
+        headers = result['response_headers']
+        body = result['response_body']
+
         # 简单的状态码原因映射
         reasons = {200: 'OK', 404: 'Not Found', 500: 'Internal Server Error'}
         reason = reasons.get(status_code, 'Unknown')
         
-        lines = [f"HTTP/1.1 {status_code} {reason}"]
+        buf = io.StringIO()
+        buf.write(f"HTTP/1.1 {status_code} {reason}\r\n")
         
         # 添加响应头
         for key, value in headers.items():
-            lines.append(f"{key}: {value}")
+            buf.write(f"{key}: {value}\r\n")
         
-        lines.append("")
+        buf.write("\r\n")
         
         # 添加响应体
-        try:
-            content_type = headers.get('Content-Type', '')
-            if 'application/json' in content_type:
-                body_str = json.dumps(json.loads(body_text), ensure_ascii=False, indent=2)
-            else:
-                body_str = body_text[:1000]  # 限制长度
-        except:
-            body_str = body_text[:1000]
+        if isinstance(body, str):
+            body_str = body[:1000]  # 限制长度
+        else:
+            body_str = dumps(body, pretty=True)
         
-        lines.append(body_str)
+        buf.write(body_str)
         
-        return "\n".join(lines)
+        return buf.getvalue()
 
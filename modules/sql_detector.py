@@ -6,10 +6,36 @@ SQL注入检测模块
 
 import re
 import os
+import asyncio
 import logging
 import difflib
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 
+# 可选依赖：Hyperscan（多模式 DFA 匹配）和 RE2（线性时间正则），未安装时使用标准库 re
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# 可选依赖：pyahocorasick，用于一次扫描匹配所有纯文本特征
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 判断错误特征是否包含正则元字符（不包含则视为纯文本特征）
+_REGEX_META_CHARS = re.compile(r'[\\.*+?\[\](){}|^$]')
+
+# 计算相似度时每个响应体最多参与比较的字符数
+# difflib 的耗时随文本长度超线性增长，且在事件循环中执行，只比较前缀以限制单次开销
+_SIMILARITY_MAX_CHARS = 8192
+
 logger = logging.getLogger('fuzzhound.sql_detector')
 
 
@@ -31,19 +57,116 @@ class SQLDetector:
         # 编译正则表达式（提高性能）
         # 对于不是正则表达式的模式，需要转义特殊字符
         self.compiled_patterns = []
-        for pattern in self.error_patterns:
+        literal_ids = []  # 纯文本特征的下标
+        for i, pattern in enumerate(self.error_patterns):
             try:
                 # 尝试直接编译（如果是正则表达式）
                 compiled = re.compile(pattern, re.IGNORECASE)
                 self.compiled_patterns.append(compiled)
+                if not _REGEX_META_CHARS.search(pattern):
+                    literal_ids.append(i)
             except re.error:
                 # 如果编译失败，转义特殊字符后再编译（作为普通字符串匹配）
                 escaped_pattern = re.escape(pattern)
                 compiled = re.compile(escaped_pattern, re.IGNORECASE)
                 self.compiled_patterns.append(compiled)
+                literal_ids.append(i)
+
+        # 将所有特征合并为一个交替正则，只需扫描一遍响应体即可判断是否命中任何特征
+        self.combined_pattern = self._compile_combined_pattern(self.compiled_patterns)
+
+        # 安装了 Hyperscan 时，所有特征编译到同一个数据库中，一次扫描即可得到全部命中的特征
+        self.hs_database = self._compile_hyperscan_database(self.compiled_patterns)
+
+        # 安装了 pyahocorasick 时，纯文本特征用 Aho-Corasick 自动机一次扫描，只有真正的正则特征才逐个匹配
+        self.literal_automaton = self._build_literal_automaton(literal_ids)
+        literal_id_set = set(literal_ids)
+        self.regex_pattern_ids = [i for i in range(len(self.compiled_patterns)) if i not in literal_id_set]
+
+        # 批量检测：等待检测的 (响应体, Future) 列表、后台检测任务，以及执行检测的单线程池
+        # （只用一个线程，Hyperscan / Aho-Corasick 等匹配器不需要考虑并发访问）
+        self.batch_size = self.sql_config.get('detect_batch_size', 64)
+        self._pending_bodies = []
+        self._batch_tasks = set()
+        self._batch_executor = None
         
         logger.info(f"✅ SQL注入检测器初始化完成，加载了 {len(self.error_patterns)} 个错误特征")
     
+    @staticmethod
+    def _compile_combined_pattern(compiled_patterns: List[re.Pattern]) -> Optional[re.Pattern]:
+        """将所有错误特征合并为一个交替正则
+
+        Args:
+            compiled_patterns: 已编译的错误特征列表
+
+        Returns:
+            合并后的正则，无特征或合并失败（如特征中含有冲突的命名分组）时返回 None
+        """
+        if not compiled_patterns:
+            return None
+        combined_source = '|'.join(f"(?:{compiled.pattern})" for compiled in compiled_patterns)
+
+        # 优先使用 RE2（DFA 实现，不会回溯），不支持的语法回退到标准库 re
+        if re2 is not None:
+            try:
+                return re2.compile(f"(?i){combined_source}")
+            except Exception as e:
+                logger.debug(f"RE2 不支持当前SQL错误特征，使用标准库 re: {e}")
+
+        try:
+            return re.compile(combined_source, re.IGNORECASE)
+        except re.error as e:
+            logger.debug(f"合并SQL错误特征失败，逐个匹配: {e}")
+            return None
+
+    @staticmethod
+    def _compile_hyperscan_database(compiled_patterns: List[re.Pattern]):
+        """将所有错误特征编译为 Hyperscan 数据库
+
+        Args:
+            compiled_patterns: 已编译的错误特征列表
+
+        Returns:
+            Hyperscan 数据库，未安装 Hyperscan、无特征或编译失败时返回 None
+        """
+        if hyperscan is None or not compiled_patterns:
+            return None
+        count = len(compiled_patterns)
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[compiled.pattern.encode('utf-8') for compiled in compiled_patterns],
+                ids=list(range(count)),
+                elements=count,
+                flags=[flags] * count
+            )
+            return database
+        except Exception as e:
+            logger.debug(f"Hyperscan 编译SQL错误特征失败，使用正则匹配: {e}")
+            return None
+
+    def _build_literal_automaton(self, literal_ids: List[int]):
+        """将纯文本错误特征构建为 Aho-Corasick 自动机
+
+        Args:
+            literal_ids: 纯文本特征在 error_patterns 中的下标
+
+        Returns:
+            自动机（匹配值为对应特征下标列表），未安装 pyahocorasick 或无纯文本特征时返回 None
+        """
+        if ahocorasick is None or not literal_ids:
+            return None
+        ids_by_word = {}
+        for i in literal_ids:
+            ids_by_word.setdefault(self.error_patterns[i].lower(), []).append(i)
+
+        automaton = ahocorasick.Automaton()
+        for word, ids in ids_by_word.items():
+            automaton.add_word(word, ids)
+        automaton.make_automaton()
+        return automaton
+
     def _load_error_patterns(self) -> List[str]:
         """加载SQL错误特征
         
@@ -108,6 +231,19 @@ class SQLDetector:
         if not self.sql_config.get('detect_errors', True):
             return False, []
 
+        if self.hs_database is not None:
+            try:
+                return self._scan_hyperscan(response_body)
+            except Exception as e:
+                logger.debug(f"Hyperscan 扫描失败，使用正则匹配: {e}")
+
+        if self.literal_automaton is not None:
+            return self._scan_literal_automaton(response_body)
+
+        # 先用合并后的正则扫描一遍，绝大多数响应不包含任何错误特征，可直接返回
+        if self.combined_pattern is not None and not self.combined_pattern.search(response_body):
+            return False, []
+
         matched_errors = []
         seen_patterns = set()  # 避免重复匹配
 
@@ -122,20 +258,154 @@ class SQLDetector:
                     seen_patterns.add(original_pattern)
 
         return len(matched_errors) > 0, matched_errors
+
+    def _detect_many(self, bodies: List[str]) -> List[Tuple[bool, List[str]]]:
+        """依次检测多个响应体"""
+        return [self.detect_sql_error(body) for body in bodies]
+
+    async def detect_batch(self, bodies: List[str]) -> List[Tuple[bool, List[str]]]:
+        """在后台线程中批量检测多个响应体，不阻塞事件循环
+
+        Args:
+            bodies: 响应体列表
+
+        Returns:
+            每个响应体的 (是否检测到SQL错误, 匹配到的错误特征列表)
+        """
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sql_detector')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._batch_executor, self._detect_many, bodies)
+
+    async def detect_sql_error_batched(self, response_body: str) -> Tuple[bool, List[str]]:
+        """检测响应中是否包含SQL错误信息（异步批量版本）
+
+        使用 Hyperscan 时，同一轮事件循环中提交的响应体（最多 batch_size 个）合并为一批，交给 detect_batch 一次检测；
+        其他匹配方式单次检测开销很小，直接在当前线程检测，避免线程切换的额外开销。
+
+        Args:
+            response_body: 响应体内容
+
+        Returns:
+            (是否检测到SQL错误, 匹配到的错误特征列表)
+        """
+        if self.hs_database is None:
+            return self.detect_sql_error(response_body)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_bodies.append((response_body, future))
+        if len(self._pending_bodies) >= self.batch_size:
+            self._flush_pending_bodies()
+        elif len(self._pending_bodies) == 1:
+            loop.call_soon(self._flush_pending_bodies)
+        return await future
+
+    def _flush_pending_bodies(self):
+        """将等待中的响应体作为一批提交检测，完成后分发结果"""
+        if not self._pending_bodies:
+            return
+        batch, self._pending_bodies = self._pending_bodies, []
+        task = asyncio.ensure_future(self.detect_batch([body for body, _ in batch]))
+        self._batch_tasks.add(task)
+
+        def on_done(task):
+            self._batch_tasks.discard(task)
+            futures = [future for _, future in batch]
+            if task.cancelled():
+                results = None
+                error = asyncio.CancelledError()
+            else:
+                error = task.exception()
+                results = None if error else task.result()
+            for i, future in enumerate(futures):
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
+
+        task.add_done_callback(on_done)
+
+    def close(self):
+        """关闭批量检测使用的线程池（未创建时无操作）"""
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=True)
+            self._batch_executor = None
+
+    def _scan_literal_automaton(self, response_body: str) -> Tuple[bool, List[str]]:
+        """纯文本特征使用 Aho-Corasick 自动机扫描，正则特征逐个匹配
+
+        Args:
+            response_body: 响应体内容
+
+        Returns:
+            (是否检测到SQL错误, 匹配到的错误特征列表)
+        """
+        hit_ids = set()
+        for _, ids in self.literal_automaton.iter(response_body.lower()):
+            hit_ids.update(ids)
+        for i in self.regex_pattern_ids:
+            if self.compiled_patterns[i].search(response_body):
+                hit_ids.add(i)
+
+        return self._collect_matched_errors(hit_ids)
+
+    def _scan_hyperscan(self, response_body: str) -> Tuple[bool, List[str]]:
+        """使用 Hyperscan 数据库扫描响应体
+
+        Args:
+            response_body: 响应体内容
+
+        Returns:
+            (是否检测到SQL错误, 匹配到的错误特征列表)
+        """
+        hit_ids = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            hit_ids.add(pattern_id)
+
+        self.hs_database.scan(response_body.encode('utf-8', 'ignore'), match_event_handler=on_match)
+
+        return self._collect_matched_errors(hit_ids)
+
+    def _collect_matched_errors(self, hit_ids) -> Tuple[bool, List[str]]:
+        """按特征原始顺序整理命中的错误特征
+
+        Args:
+            hit_ids: 命中的特征下标集合
+
+        Returns:
+            (是否检测到SQL错误, 匹配到的错误特征列表)
+        """
+        matched_errors = []
+        seen_patterns = set()  # 避免重复匹配
+        for i in sorted(hit_ids):
+            original_pattern = self.error_patterns[i]
+            if original_pattern not in seen_patterns:
+                matched_errors.append(original_pattern)
+                seen_patterns.add(original_pattern)
+
+        return len(matched_errors) > 0, matched_errors
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
-        """计算两个文本的相似度 (0.0 - 1.0)"""
+        """计算两个文本的相似度 (0.0 - 1.0)，超长文本只比较前 _SIMILARITY_MAX_CHARS 个字符"""
         if not text1 and not text2:
             return 1.0
         if not text1 or not text2:
             return 0.0
+        text1 = text1[:_SIMILARITY_MAX_CHARS]
+        text2 = text2[:_SIMILARITY_MAX_CHARS]
+        if text1 == text2:
+            return 1.0
         return difflib.SequenceMatcher(None, text1, text2).ratio()
 
-    def analyze_response_diff(self, baseline_response: dict, fuzz_response: dict) -> Dict:
+    def analyze_response_diff(self, baseline_response, fuzz_response: dict) -> Dict:
         """分析响应差异
         
         Args:
-            baseline_response: 基线响应
+            baseline_response: 基线响应（FuzzDetector.get_baseline 的返回值）
             fuzz_response: Fuzz响应
         
         Returns:
@@ -154,22 +424,26 @@ class SQLDetector:
         }
         
         # 状态码差异
-        baseline_status = baseline_response.get('status_code', 0)
+        baseline_status = baseline_response.status_code
         fuzz_status = fuzz_response.get('status_code', 0)
         if baseline_status != fuzz_status:
             result['status_code_diff'] = True
             result['has_diff'] = True
         
-        # 响应长度差异
-        baseline_body = str(baseline_response.get('body', ''))
-        fuzz_body = str(fuzz_response.get('body', ''))
+        # 响应长度差异（比较实际的响应体）
+        baseline_body = baseline_response.body_text
+        fuzz_body = fuzz_response.get('response_body')
+        fuzz_body = str(fuzz_body) if fuzz_body is not None else ''
         baseline_length = len(baseline_body)
         fuzz_length = len(fuzz_body)
         length_diff = abs(baseline_length - fuzz_length)
         result['length_diff'] = length_diff
+
+        # 长度不同则内容必然不同，长度相同时才比较内容
+        content_diff = length_diff > 0 or baseline_body != fuzz_body
         
-        # 计算相似度
-        similarity = self.calculate_similarity(baseline_body, fuzz_body)
+        # 计算相似度（内容相同时相似度为 1.0，无需 difflib 计算）
+        similarity = self.calculate_similarity(baseline_body, fuzz_body) if content_diff else 1.0
         result['similarity'] = similarity
         
         # 判断是否为显著差异
@@ -185,8 +459,8 @@ class SQLDetector:
             result['significant_diff'] = True
             result['has_diff'] = True
         
-        # 内容差异（简单比较）
-        if baseline_body != fuzz_body:
+        # 内容差异
+        if content_diff:
             result['content_diff'] = True
             result['has_diff'] = True
         
@@ -210,23 +484,22 @@ class SQLDetector:
             error_count = len(detection_result.get('matched_errors', []))
             score += min(error_count * 5, 20)
         
-        # 显著响应差异 +30分
+        # 显著响应差异 +20分
+        # 仅凭响应差异（最多 20 + 10 + 10 = 40 分）达不到 50 分，不会在没有 SQL 错误特征时被判为漏洞
         diff_result = detection_result.get('diff_result', {})
         if diff_result.get('significant_diff', False):
-            score += 30
+            score += 20
             
             # 如果相似度非常低 (< 0.5)，额外加分
             similarity = diff_result.get('similarity', 1.0)
             if similarity < 0.5:
-                score += 20
+                score += 10
         
         # 状态码变化 +10分
         if diff_result.get('status_code_diff', False):
             score += 10
         
-        # 响应长度差异 +10分
-        if diff_result.get('length_diff', 0) > 0:
-            score += 10
+        # 响应长度的细微差异（如参数回显）不计分，超过 diff_threshold 时已计入显著差异
         
         return min(score, 100)
 
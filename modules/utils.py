@@ -4,13 +4,50 @@
 工具函数模块
 """
 
+import json
 import logging
 import os
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
-from rich.console import Console
+from modules.console import console
 
-console = Console()
+# 可选依赖：orjson（C 实现的 JSON 库），未安装时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, pretty=False):
+    """序列化为 JSON 文本（优先使用 orjson，未安装或数据类型不受支持时回退到标准库）
+
+    Args:
+        obj: 待序列化的对象
+        pretty: 是否使用 2 空格缩进
+
+    Returns:
+        str: JSON 文本（非 ASCII 字符不转义）
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None)
+
+
+def loads(data):
+    """解析 JSON 文本（str 或 UTF-8 字节），优先使用 orjson
+
+    Args:
+        data: JSON 文本
+
+    Returns:
+        解析后的对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def setup_logger(config=None, verbose=False, debug=False):